@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Shared idc-index plumbing for the IDC helper scripts.
+
+Holds the lazily created IDCClient and DuckDB connection used by
+idc_download.py and idc_viewer.py, plus the WHERE-clause builder that
+keeps optional-filter SQL canonical across calls.
+"""
+
+import sys
+from typing import List, Optional, Tuple
+
+try:
+    import duckdb
+    from idc_index import IDCClient
+except ImportError:
+    print("Error: idc-index is not installed. Install it with: pip install --upgrade idc-index")
+    sys.exit(1)
+
+
+_CLIENT: Optional[IDCClient] = None
+_CONNECTION: Optional["duckdb.DuckDBPyConnection"] = None
+
+
+def _get_client() -> IDCClient:
+    """Return the shared IDCClient, creating it on first use.
+
+    IDCClient() loads the parquet mini-index on construction, so a fresh
+    instance per call would pay that I/O cost every time. All helpers
+    share one lazily created client instead.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = IDCClient()
+    return _CLIENT
+
+
+def _get_connection() -> "duckdb.DuckDBPyConnection":
+    """Return a shared DuckDB connection with the mini-index registered.
+
+    Queries go through duckdb.execute with ? placeholders so SQL text
+    stays identical across calls and prepared plans can be reused.
+    """
+    global _CONNECTION
+    if _CONNECTION is None:
+        client = _get_client()
+        _CONNECTION = duckdb.connect()
+        _CONNECTION.register('index', client.index)
+    return _CONNECTION
+
+
+def reset_client() -> None:
+    """Drop the cached client so the next call creates a fresh one (for tests)."""
+    global _CLIENT, _CONNECTION
+    if _CONNECTION is not None:
+        _CONNECTION.close()
+    _CLIENT = None
+    _CONNECTION = None
+
+
+# Mini-index columns that may appear as filter keys. _where splices keys
+# into SQL text, so anything outside this set is rejected up front.
+_ALLOWED_FILTER_COLUMNS = {
+    'collection_id',
+    'PatientID',
+    'StudyInstanceUID',
+    'SeriesInstanceUID',
+    'Modality',
+    'BodyPartExamined',
+    'Manufacturer',
+    'license_short_name',
+}
+
+
+def _where(**filters) -> Tuple[str, List]:
+    """Build a parameterized WHERE clause from optional equality filters.
+
+    Filters whose value is None are skipped, so every call with the same
+    set of active keys produces identical SQL text. Keys must be in
+    _ALLOWED_FILTER_COLUMNS (they are spliced into the SQL); values always
+    bind as ? parameters.
+
+    Returns:
+        ('WHERE col_a = ? AND col_b = ?', [value_a, value_b]), or
+        ('', []) when no filter is active
+
+    Raises:
+        ValueError: If a filter key is not an allowed column
+    """
+    clauses = []
+    params = []
+    for column, value in filters.items():
+        if column not in _ALLOWED_FILTER_COLUMNS:
+            raise ValueError(f"Unsupported filter column '{column}' "
+                             f"(expected one of {sorted(_ALLOWED_FILTER_COLUMNS)})")
+        if value is None:
+            continue
+        clauses.append(f"{column} = ?")
+        params.append(value)
+    if not clauses:
+        return '', []
+    return 'WHERE ' + ' AND '.join(clauses), params
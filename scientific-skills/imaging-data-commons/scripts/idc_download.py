@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+IDC Download Helper
+
+Convenience functions for querying and downloading public cancer imaging
+data from NCI Imaging Data Commons via the idc-index package. Covers the
+common patterns from the skill documentation: searching by cancer type,
+modality, or collection, estimating download sizes, and downloading by
+collection, SQL query, or metadata filters.
+
+No authentication is required. Check `license_short_name` before using
+downloaded data commercially.
+
+Usage:
+    python idc_download.py collection rider_pilot --download-dir ./data
+    python idc_download.py estimate --collection-id nlst
+    python idc_download.py filtered --modality CT --body-part CHEST --download-dir ./data
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+try:
+    import pandas as pd
+except ImportError:
+    print("Error: pandas is not installed. Install it with: pip install pandas")
+    sys.exit(1)
+
+from idc_client import _get_client, _get_connection, _where, reset_client  # noqa: F401
+
+
+_DOWNLOAD_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def _download_executor() -> ThreadPoolExecutor:
+    """Return the shared single-thread executor for nonblocking downloads."""
+    global _DOWNLOAD_EXECUTOR
+    if _DOWNLOAD_EXECUTOR is None:
+        _DOWNLOAD_EXECUTOR = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='idc-download')
+    return _DOWNLOAD_EXECUTOR
+
+
+def search_by_cancer_type(cancer_type: str, modality: Optional[str] = None,
+                          limit: int = 20) -> pd.DataFrame:
+    """
+    Find series for a given cancer type by joining with collections_index.
+
+    Args:
+        cancer_type: Cancer type to match (e.g., "Breast", "Lung")
+        modality: Optional DICOM modality filter (e.g., "CT", "MR")
+        limit: Maximum number of series to return
+
+    Returns:
+        DataFrame with series-level metadata for matching collections
+    """
+    client = _get_client()
+    client.fetch_index("collections_index")
+    con = _get_connection()
+    con.register('collections_index', client.collections_index)
+
+    query = """
+    SELECT i.collection_id, i.PatientID, i.SeriesInstanceUID, i.Modality,
+           i.BodyPartExamined, i.SeriesDescription, i.license_short_name
+    FROM index i
+    JOIN collections_index c ON i.collection_id = c.collection_id
+    WHERE c.CancerTypes LIKE '%' || ? || '%'
+      AND (? IS NULL OR i.Modality = ?)
+    LIMIT ?
+    """
+    return con.execute(query, [cancer_type, modality, modality, limit]).df()
+
+
+def search_by_modality(modality: str, body_part: Optional[str] = None,
+                       limit: int = 20) -> pd.DataFrame:
+    """
+    Find series by imaging modality, optionally restricted to a body part.
+
+    Args:
+        modality: DICOM modality (e.g., "CT", "MR", "PT", "SM")
+        body_part: Optional BodyPartExamined filter (e.g., "CHEST", "BRAIN")
+        limit: Maximum number of series to return
+
+    Returns:
+        DataFrame with series-level metadata
+    """
+    where_sql, params = _where(Modality=modality, BodyPartExamined=body_part)
+    query = f"""
+    SELECT collection_id, PatientID, SeriesInstanceUID, Modality,
+           BodyPartExamined, SeriesDescription, license_short_name
+    FROM index
+    {where_sql}
+    LIMIT ?
+    """
+    return _get_connection().execute(query, params + [limit]).df()
+
+
+def search_by_collection(collection_id: str, modality: Optional[str] = None,
+                         limit: int = 20) -> pd.DataFrame:
+    """
+    List series within a single IDC collection.
+
+    Args:
+        collection_id: IDC collection identifier (e.g., "rider_pilot", "nlst")
+        modality: Optional DICOM modality filter
+        limit: Maximum number of series to return
+
+    Returns:
+        DataFrame with series-level metadata
+    """
+    where_sql, params = _where(collection_id=collection_id, Modality=modality)
+    query = f"""
+    SELECT PatientID, StudyInstanceUID, SeriesInstanceUID, Modality,
+           BodyPartExamined, SeriesDescription, series_size_MB
+    FROM index
+    {where_sql}
+    LIMIT ?
+    """
+    return _get_connection().execute(query, params + [limit]).df()
+
+
+def get_collections_summary(approximate: bool = True) -> pd.DataFrame:
+    """
+    Summarize all IDC collections: patient/series counts and total size.
+
+    Args:
+        approximate: Use DuckDB's HyperLogLog approx_count_distinct for the
+            patient count (the summary is a sense-of-scale view, and the
+            approximation avoids one exact distinct hash set per
+            collection). Pass False for exact counts when auditing.
+
+    Returns:
+        DataFrame with one row per collection, ordered by patient count
+    """
+    if approximate:
+        patient_count = "approx_count_distinct(PatientID)"
+    else:
+        patient_count = "COUNT(DISTINCT PatientID)"
+
+    # num_series is a plain COUNT(*): the mini-index is one row per series.
+    query = f"""
+    SELECT
+      collection_id,
+      {patient_count} as num_patients,
+      COUNT(*) as num_series,
+      SUM(series_size_MB) as total_size_MB
+    FROM index
+    GROUP BY collection_id
+    ORDER BY num_patients DESC
+    """
+    return _get_connection().execute(query).df()
+
+
+def check_licenses(collection_id: Optional[str] = None) -> pd.DataFrame:
+    """
+    Report the licenses attached to IDC data (critical before commercial use).
+
+    Args:
+        collection_id: Optional collection to restrict the report to
+
+    Returns:
+        DataFrame with license breakdown and series counts per collection
+    """
+    # The mini-index is one row per series, so a plain COUNT(*) per group
+    # replaces COUNT(DISTINCT SeriesInstanceUID) and its per-group hash set;
+    # GROUP BY already deduplicates, making an outer DISTINCT redundant.
+    where_sql, params = _where(collection_id=collection_id)
+    query = f"""
+    SELECT
+      collection_id,
+      license_short_name,
+      license_url,
+      COUNT(*) as num_series
+    FROM index
+    {where_sql}
+    GROUP BY collection_id, license_short_name, license_url
+    ORDER BY collection_id
+    """
+    return _get_connection().execute(query, params).df()
+
+
+def get_download_size_estimate(collection_id: Optional[str] = None,
+                               series_uids: Optional[List[str]] = None,
+                               total_mb: Optional[float] = None,
+                               series_count: Optional[int] = None) -> Dict:
+    """
+    Estimate the download size for a collection or an explicit series list.
+
+    Some collections are terabytes in size — always estimate before
+    downloading.
+
+    Args:
+        collection_id: IDC collection identifier
+        series_uids: Explicit list of SeriesInstanceUIDs (overrides collection_id)
+        total_mb: Precomputed total size in MB; when given together with
+            series_count, no query is issued (used by download_collection,
+            whose listing query already returns the total)
+        series_count: Precomputed series count accompanying total_mb
+
+    Returns:
+        Dict with 'series_count', 'total_MB', and 'total_GB'
+    """
+    if total_mb is not None and series_count is not None:
+        return {
+            'series_count': int(series_count),
+            'total_MB': float(total_mb),
+            'total_GB': float(total_mb) / 1024,
+        }
+
+    if series_uids is not None:
+        # The UID list binds as one LIST parameter and DuckDB builds a
+        # semi-join hash, instead of lexing a megabyte-scale IN (...) literal.
+        query = """
+        SELECT COUNT(*) as series_count, SUM(series_size_MB) as total_MB
+        FROM index
+        WHERE SeriesInstanceUID IN (SELECT UNNEST(?))
+        """
+        row = _get_connection().execute(query, [list(series_uids)]).fetchone()
+    elif collection_id:
+        query = """
+        SELECT COUNT(*) as series_count, SUM(series_size_MB) as total_MB
+        FROM index
+        WHERE collection_id = ?
+        """
+        row = _get_connection().execute(query, [collection_id]).fetchone()
+    else:
+        raise ValueError("Provide either collection_id or series_uids")
+
+    # fetchone() avoids building a one-row DataFrame for two scalars.
+    total_mb = float(row[1] or 0)
+    return {
+        'series_count': int(row[0]),
+        'total_MB': total_mb,
+        'total_GB': total_mb / 1024,
+    }
+
+
+def download_collection(collection_id: str, download_dir: str,
+                        modality: Optional[str] = None,
+                        dir_template: Optional[str] = None,
+                        nonblocking: bool = False) -> Union[List[str], Future]:
+    """
+    Download all series of a collection (optionally one modality only).
+
+    Args:
+        collection_id: IDC collection identifier (e.g., "rider_pilot")
+        download_dir: Local directory to download into
+        modality: Optional DICOM modality filter (e.g., "CT")
+        dir_template: Optional idc-index dirTemplate for the output hierarchy
+        nonblocking: Run the download in a background thread and return a
+            Future that resolves to the SeriesInstanceUID list
+
+    Returns:
+        List of downloaded SeriesInstanceUIDs, or a Future of it when
+        nonblocking is True
+    """
+    client = _get_client()
+
+    # Create the output directory before querying, to fail fast on
+    # permission problems instead of after a potentially long query.
+    os.makedirs(download_dir, exist_ok=True)
+
+    # One listing query returns the UIDs and their per-series sizes; the
+    # mini-index is one row per series, so no DISTINCT/dedup step is needed.
+    where_sql, params = _where(collection_id=collection_id, Modality=modality)
+    query = f"""
+    SELECT SeriesInstanceUID, series_size_MB
+    FROM index
+    {where_sql}
+    """
+    # fetchall() skips DataFrame construction; only the UID list and the
+    # sizes are needed here.
+    rows = _get_connection().execute(query, params).fetchall()
+    if not rows:
+        print(f"No series found for collection '{collection_id}'")
+        return []
+    series_uids = [row[0] for row in rows]
+
+    # The per-series sizes are already in hand, so the total is a plain sum
+    # over them — no window aggregate or size-estimate round trip needed.
+    estimate = get_download_size_estimate(
+        total_mb=sum(size or 0 for _, size in rows),
+        series_count=len(rows),
+    )
+    print(f"Downloading {estimate['series_count']} series "
+          f"(~{estimate['total_GB']:.1f} GB) to {download_dir}")
+
+    kwargs = {'seriesInstanceUID': series_uids, 'downloadDir': download_dir}
+    if dir_template is not None:
+        kwargs['dirTemplate'] = dir_template
+
+    def _run() -> List[str]:
+        client.download_from_selection(**kwargs)
+        return series_uids
+
+    if nonblocking:
+        return _download_executor().submit(_run)
+    return _run()
+
+
+def download_by_query(sql_query: str, download_dir: str,
+                      save_manifest: bool = True,
+                      params: Optional[List] = None,
+                      batch_size: int = 10_000) -> List[str]:
+    """
+    Download the series returned by an arbitrary SQL query.
+
+    The query must select a SeriesInstanceUID column from the index.
+    Results stream through in Arrow record batches, so peak memory is
+    bounded by batch_size rather than the full result set, and the
+    downloader starts fetching before the last batch is produced.
+
+    Args:
+        sql_query: SQL query against the idc-index tables
+        download_dir: Local directory to download into
+        save_manifest: Save the query results as manifest.csv for provenance
+        params: Values for ? placeholders in sql_query
+        batch_size: Series per download batch
+
+    Returns:
+        List of downloaded SeriesInstanceUIDs
+    """
+    client = _get_client()
+
+    # Create the output directory before querying: it is needed for the
+    # download regardless of save_manifest, and failing fast on permission
+    # problems beats failing after a long query.
+    os.makedirs(download_dir, exist_ok=True)
+
+    reader = _get_connection().execute(
+        sql_query, params or []).fetch_record_batch(batch_size)
+    if 'SeriesInstanceUID' not in reader.schema.names:
+        raise ValueError("Query must select a SeriesInstanceUID column")
+
+    manifest_path = os.path.join(download_dir, 'manifest.csv')
+    series_uids: List[str] = []
+    for batch in reader:
+        uids = batch.column('SeriesInstanceUID').to_pylist()
+        if not uids:
+            continue
+        if save_manifest:
+            # First batch writes the header, later batches append.
+            batch.to_pandas().to_csv(manifest_path, index=False,
+                                     mode='w' if not series_uids else 'a',
+                                     header=not series_uids)
+        client.download_from_selection(
+            seriesInstanceUID=uids,
+            downloadDir=download_dir,
+        )
+        series_uids.extend(uids)
+
+    if not series_uids:
+        print("Query returned no series")
+        return []
+    if save_manifest:
+        print(f"Saved manifest to {manifest_path}")
+    return series_uids
+
+
+def download_filtered(download_dir: str,
+                      modality: Optional[str] = None,
+                      body_part: Optional[str] = None,
+                      collection_id: Optional[str] = None,
+                      manufacturer: Optional[str] = None,
+                      license: Optional[str] = None,
+                      limit: int = 100) -> List[str]:
+    """
+    Download series matching simple metadata filters.
+
+    Args:
+        download_dir: Local directory to download into
+        modality: DICOM Modality (e.g., "CT")
+        body_part: BodyPartExamined (e.g., "CHEST")
+        collection_id: IDC collection identifier
+        manufacturer: Equipment Manufacturer (e.g., "GE MEDICAL SYSTEMS")
+        license: license_short_name (e.g., "CC BY 4.0")
+        limit: Maximum number of series to download
+
+    Returns:
+        List of downloaded SeriesInstanceUIDs
+    """
+    where_sql, params = _where(
+        Modality=modality,
+        BodyPartExamined=body_part,
+        collection_id=collection_id,
+        Manufacturer=manufacturer,
+        license_short_name=license,
+    )
+    if not params:
+        raise ValueError("Provide at least one filter")
+
+    query = f"SELECT SeriesInstanceUID FROM index {where_sql} LIMIT ?"
+    return download_by_query(query, download_dir, params=params + [limit])
+
+
+def resume_download(manifest_path: str, download_dir: str,
+                    nonblocking: bool = False) -> Union[List[str], Future]:
+    """
+    Re-run a download from a previously saved manifest.
+
+    idc-index syncs against existing files, so already-downloaded series
+    are skipped and only missing data is fetched.
+
+    Args:
+        manifest_path: Path to a manifest.csv written by download_by_query
+        download_dir: Local directory the original download targeted
+        nonblocking: Run the download in a background thread and return a
+            Future that resolves to the SeriesInstanceUID list
+
+    Returns:
+        List of SeriesInstanceUIDs in the manifest, or a Future of it when
+        nonblocking is True
+    """
+    client = _get_client()
+
+    manifest = pd.read_csv(manifest_path)
+    if 'SeriesInstanceUID' not in manifest.columns:
+        raise ValueError("Manifest must contain a SeriesInstanceUID column")
+
+    series_uids = list(manifest['SeriesInstanceUID'].values)
+    print(f"Resuming download of {len(series_uids)} series to {download_dir}")
+
+    def _run() -> List[str]:
+        client.download_from_selection(
+            seriesInstanceUID=series_uids,
+            downloadDir=download_dir,
+        )
+        return series_uids
+
+    if nonblocking:
+        return _download_executor().submit(_run)
+    return _run()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Query and download imaging data from NCI Imaging Data Commons',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python idc_download.py collection rider_pilot --download-dir ./data
+  python idc_download.py estimate --collection-id nlst
+  python idc_download.py filtered --modality CT --body-part CHEST --download-dir ./data
+  python idc_download.py resume ./data/manifest.csv --download-dir ./data
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p_collection = subparsers.add_parser('collection', help='Download an entire collection')
+    p_collection.add_argument('collection_id', help='IDC collection identifier')
+    p_collection.add_argument('--download-dir', default='./idc_data', help='Output directory')
+    p_collection.add_argument('--modality', help='Restrict to one DICOM modality')
+
+    p_estimate = subparsers.add_parser('estimate', help='Estimate download size')
+    p_estimate.add_argument('--collection-id', required=True, help='IDC collection identifier')
+
+    p_filtered = subparsers.add_parser('filtered', help='Download by metadata filters')
+    p_filtered.add_argument('--download-dir', default='./idc_data', help='Output directory')
+    p_filtered.add_argument('--modality', help='DICOM Modality (e.g., CT)')
+    p_filtered.add_argument('--body-part', help='BodyPartExamined (e.g., CHEST)')
+    p_filtered.add_argument('--collection-id', help='IDC collection identifier')
+    p_filtered.add_argument('--limit', type=int, default=100, help='Maximum series to download')
+
+    p_resume = subparsers.add_parser('resume', help='Resume a download from a manifest')
+    p_resume.add_argument('manifest', help='Path to manifest.csv')
+    p_resume.add_argument('--download-dir', default='./idc_data', help='Output directory')
+
+    p_licenses = subparsers.add_parser('licenses', help='Show license breakdown')
+    p_licenses.add_argument('--collection-id', help='Restrict to one collection')
+
+    args = parser.parse_args()
+
+    if args.command == 'collection':
+        download_collection(args.collection_id, args.download_dir, modality=args.modality)
+    elif args.command == 'estimate':
+        estimate = get_download_size_estimate(collection_id=args.collection_id)
+        print(f"{args.collection_id}: {estimate['series_count']} series, "
+              f"~{estimate['total_GB']:.1f} GB")
+    elif args.command == 'filtered':
+        download_filtered(
+            args.download_dir,
+            modality=args.modality,
+            body_part=args.body_part,
+            collection_id=args.collection_id,
+            limit=args.limit,
+        )
+    elif args.command == 'resume':
+        resume_download(args.manifest, args.download_dir)
+    elif args.command == 'licenses':
+        print(check_licenses(collection_id=args.collection_id).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+IDC Viewer Helper
+
+Preview Imaging Data Commons series in the browser without downloading.
+Generates OHIF (radiology) and SLIM (slide microscopy) viewer URLs,
+fetches series metadata from the idc-index mini-index, and builds IDC
+Portal search links for interactive exploration.
+
+Usage:
+    python idc_viewer.py preview rider_pilot --num-samples 5
+    python idc_viewer.py metadata <SeriesInstanceUID>
+    python idc_viewer.py url <SeriesInstanceUID> --open
+"""
+
+import argparse
+import re
+import sys
+import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+try:
+    import pandas as pd
+except ImportError:
+    print("Error: pandas is not installed. Install it with: pip install pandas")
+    sys.exit(1)
+
+from idc_client import _get_client, _get_connection, _where, reset_client  # noqa: F401
+
+
+# OHIF for radiology, SLIM for slide microscopy; append a SeriesInstanceUID.
+VIEWER_BASE_URLS = {
+    'ohif': 'https://viewer.imaging.datacommons.cancer.gov/viewer/?SeriesInstanceUID=',
+    'slim': 'https://viewer.imaging.datacommons.cancer.gov/slim/series/',
+}
+
+PORTAL_BASE_URL = 'https://portal.imaging.datacommons.cancer.gov/explore/'
+
+# DICOM UIDs are dot-separated numeric components (PS3.5 section 9.1).
+# Compiled once at import so per-call validation skips the re-cache lookup.
+_UID_RE = re.compile(r'\A\d+(?:\.\d+)+\Z')
+
+
+def validate_series_uid(series_uid: str) -> bool:
+    """
+    Check that a string looks like a valid DICOM UID.
+
+    DICOM UIDs are dot-separated numeric components, at most 64 characters
+    (PS3.5 section 9.1).
+
+    Args:
+        series_uid: Candidate SeriesInstanceUID
+
+    Returns:
+        True if the string is a plausible DICOM UID
+    """
+    return len(series_uid) <= 64 and bool(_UID_RE.match(series_uid))
+
+
+def validate_series_uids(series_uids: List[str]) -> pd.Series:
+    """
+    Validate many DICOM UIDs at once.
+
+    Uses pandas' vectorized string matching, which runs the compiled regex
+    in a C loop instead of one Python-level call per UID.
+
+    Args:
+        series_uids: Candidate SeriesInstanceUIDs
+
+    Returns:
+        Boolean Series aligned with the input order
+    """
+    uids = pd.Series(series_uids)
+    return (uids.str.len() <= 64) & uids.str.match(_UID_RE)
+
+
+def generate_viewer_url(series_uid: str, viewer_type: str = 'ohif') -> str:
+    """
+    Build a browser viewer URL for a single series.
+
+    Args:
+        series_uid: SeriesInstanceUID to view
+        viewer_type: 'ohif' for radiology, 'slim' for slide microscopy
+
+    Returns:
+        Viewer URL string
+    """
+    if viewer_type not in VIEWER_BASE_URLS:
+        raise ValueError(f"Unknown viewer type '{viewer_type}' "
+                         f"(expected one of {sorted(VIEWER_BASE_URLS)})")
+    if not validate_series_uid(series_uid):
+        raise ValueError(f"'{series_uid}' is not a valid DICOM UID")
+    return VIEWER_BASE_URLS[viewer_type] + series_uid
+
+
+def _build_viewer_urls(series_uids: List[str], viewer_type: str = 'ohif') -> List[str]:
+    """
+    Build viewer URLs for many series at once.
+
+    Resolves the viewer base URL a single time and validates the whole
+    batch with one vectorized check, instead of a per-UID
+    generate_viewer_url call with its regex and dict lookup.
+
+    Args:
+        series_uids: SeriesInstanceUIDs to link to
+        viewer_type: 'ohif' for radiology, 'slim' for slide microscopy
+
+    Returns:
+        Viewer URLs in input order
+    """
+    if viewer_type not in VIEWER_BASE_URLS:
+        raise ValueError(f"Unknown viewer type '{viewer_type}' "
+                         f"(expected one of {sorted(VIEWER_BASE_URLS)})")
+    uids = list(series_uids)
+    if uids and not validate_series_uids(uids).all():
+        raise ValueError("Input contains invalid DICOM UIDs")
+    base = VIEWER_BASE_URLS[viewer_type]
+    return [base + uid for uid in uids]
+
+
+def generate_portal_search_url(filters: Optional[Dict[str, str]] = None) -> str:
+    """
+    Build an IDC Portal explore URL with optional search filters.
+
+    Args:
+        filters: Mapping of portal filter names to values
+                 (e.g., {'collection_id': 'nlst', 'Modality': 'CT'})
+
+    Returns:
+        Portal URL string
+    """
+    if not filters:
+        return PORTAL_BASE_URL
+    # urlencode percent-escapes values (spaces, '&', '=', non-ASCII) that a
+    # manual f-string join would pass through broken.
+    return PORTAL_BASE_URL + '?' + urlencode(filters)
+
+
+def get_series_metadata_bulk(series_uids: List[str]) -> pd.DataFrame:
+    """
+    Fetch mini-index metadata for many series with a single query.
+
+    One bulk lookup replaces N per-UID round trips through the query
+    engine when previewing batches of series.
+
+    Args:
+        series_uids: SeriesInstanceUIDs to look up
+
+    Returns:
+        DataFrame indexed by SeriesInstanceUID; UIDs missing from the
+        current IDC version are simply absent from the result
+
+    Raises:
+        ValueError: If any UID is malformed
+    """
+    valid = validate_series_uids(series_uids)
+    if not valid.all():
+        bad = list(pd.Series(series_uids)[~valid.values])
+        raise ValueError(f"Not valid DICOM UIDs: {bad}")
+
+    query = """
+    SELECT collection_id, PatientID, StudyInstanceUID, SeriesInstanceUID,
+           Modality, BodyPartExamined, SeriesDescription, Manufacturer,
+           series_size_MB, instanceCount, license_short_name
+    FROM index
+    WHERE SeriesInstanceUID IN (SELECT UNNEST(?))
+    """
+    result = _get_connection().execute(query, [list(series_uids)]).df()
+    return result.set_index('SeriesInstanceUID', drop=False)
+
+
+def get_series_metadata(series_uid: str) -> Dict:
+    """
+    Fetch mini-index metadata for a single series.
+
+    Args:
+        series_uid: SeriesInstanceUID to look up
+
+    Returns:
+        Dict of metadata columns for the series
+
+    Raises:
+        ValueError: If the UID is malformed or not in the current IDC version
+    """
+    result = get_series_metadata_bulk([series_uid])
+    if len(result) == 0:
+        raise ValueError(f"Series '{series_uid}' not found in the current IDC index")
+    return result.iloc[0].to_dict()
+
+
+def preview_series(series_uid: str, viewer_type: str = 'ohif',
+                   open_browser: bool = True) -> str:
+    """
+    Print metadata for one series and optionally open it in the browser.
+
+    Args:
+        series_uid: SeriesInstanceUID to preview
+        viewer_type: 'ohif' for radiology, 'slim' for slide microscopy
+        open_browser: Open the viewer URL in the default browser
+
+    Returns:
+        The viewer URL
+    """
+    metadata = get_series_metadata(series_uid)
+    url = generate_viewer_url(series_uid, viewer_type)
+
+    print(f"Collection: {metadata['collection_id']}")
+    print(f"Patient:    {metadata['PatientID']}")
+    print(f"Modality:   {metadata['Modality']}")
+    print(f"Series:     {metadata['SeriesDescription']}")
+    print(f"View at:    {url}")
+
+    if open_browser:
+        webbrowser.open(url)
+    return url
+
+
+def preview_series_batch(series_uids: List[str], viewer_type: str = 'ohif',
+                         open_browser: bool = True,
+                         max_workers: int = 4) -> List[str]:
+    """
+    Preview many series at once.
+
+    Fetches metadata for all UIDs with one bulk query, then dispatches the
+    browser opens through a small thread pool: webbrowser.open blocks on a
+    subprocess spawn, so opening viewers serially is dominated by spawn
+    latency rather than real work.
+
+    Args:
+        series_uids: SeriesInstanceUIDs to preview
+        viewer_type: 'ohif' for radiology, 'slim' for slide microscopy
+        open_browser: Open the viewer URLs in the default browser
+        max_workers: Threads used for the browser opens
+
+    Returns:
+        Viewer URLs in input order
+    """
+    urls = _build_viewer_urls(list(series_uids), viewer_type)
+    metadata = get_series_metadata_bulk(list(series_uids))
+
+    for uid, url in zip(series_uids, urls):
+        if uid in metadata.index:
+            row = metadata.loc[uid]
+            print(f"Patient {row['PatientID']} [{row['Modality']}]: {row['SeriesDescription']}")
+        else:
+            print(f"Series {uid}: not in the current IDC index")
+        print(f"  View at: {url}")
+
+    if open_browser and urls:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(webbrowser.open, urls))
+    return urls
+
+
+def preview_collection_sample(collection_id: str, num_samples: int = 5,
+                              viewer_type: str = 'ohif',
+                              open_browser: bool = False) -> pd.DataFrame:
+    """
+    Sample a few series from a collection and print their viewer URLs.
+
+    Useful for eyeballing a collection before committing to a download.
+
+    Args:
+        collection_id: IDC collection identifier (e.g., "rider_pilot")
+        num_samples: Number of series to sample
+        viewer_type: 'ohif' for radiology, 'slim' for slide microscopy
+        open_browser: Open each viewer URL in the default browser
+
+    Returns:
+        DataFrame of the sampled series metadata with a 'viewer_url' column
+    """
+    if viewer_type not in VIEWER_BASE_URLS:
+        raise ValueError(f"Unknown viewer type '{viewer_type}' "
+                         f"(expected one of {sorted(VIEWER_BASE_URLS)})")
+
+    where_sql, params = _where(collection_id=collection_id)
+    query = f"""
+    SELECT SeriesInstanceUID, PatientID, Modality, SeriesDescription
+    FROM index
+    {where_sql}
+    LIMIT ?
+    """
+    results = _get_connection().execute(query, params + [num_samples]).df()
+    if len(results) == 0:
+        print(f"No series found for collection '{collection_id}'")
+        return results
+
+    # One bulk helper call: base URL resolved once, UIDs checked with a
+    # single vectorized pass instead of per-row generate_viewer_url calls.
+    results['viewer_url'] = _build_viewer_urls(
+        results['SeriesInstanceUID'].values, viewer_type)
+
+    # Iterate over the column arrays directly; iterrows() would allocate a
+    # fresh Series per row.
+    for url, patient, modality, description in zip(
+            results['viewer_url'].values, results['PatientID'].values,
+            results['Modality'].values, results['SeriesDescription'].values):
+        print(f"Patient {patient} [{modality}]: {description}")
+        print(f"  View at: {url}")
+
+    if open_browser and len(results):
+        # Overlap the subprocess spawns instead of blocking on each open.
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(webbrowser.open, results['viewer_url'].values))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Preview Imaging Data Commons series in the browser',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python idc_viewer.py preview rider_pilot --num-samples 5
+  python idc_viewer.py metadata 1.3.6.1.4.1.9328.50.1.69736
+  python idc_viewer.py url 1.3.6.1.4.1.9328.50.1.69736 --open
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p_preview = subparsers.add_parser('preview', help='Preview a sample of a collection')
+    p_preview.add_argument('collection_id', help='IDC collection identifier')
+    p_preview.add_argument('--num-samples', type=int, default=5, help='Series to sample')
+    p_preview.add_argument('--viewer', default='ohif', choices=sorted(VIEWER_BASE_URLS),
+                           help='Viewer to link to (default: ohif)')
+    p_preview.add_argument('--open', action='store_true', help='Open URLs in the browser')
+
+    p_metadata = subparsers.add_parser('metadata', help='Show metadata for a series')
+    p_metadata.add_argument('series_uid', help='SeriesInstanceUID')
+
+    p_url = subparsers.add_parser('url', help='Generate a viewer URL for a series')
+    p_url.add_argument('series_uid', help='SeriesInstanceUID')
+    p_url.add_argument('--viewer', default='ohif', choices=sorted(VIEWER_BASE_URLS),
+                       help='Viewer to link to (default: ohif)')
+    p_url.add_argument('--open', action='store_true', help='Open the URL in the browser')
+
+    args = parser.parse_args()
+
+    if args.command == 'preview':
+        preview_collection_sample(
+            args.collection_id,
+            num_samples=args.num_samples,
+            viewer_type=args.viewer,
+            open_browser=args.open,
+        )
+    elif args.command == 'metadata':
+        metadata = get_series_metadata(args.series_uid)
+        for key, value in metadata.items():
+            print(f"{key:24s} {value}")
+    elif args.command == 'url':
+        if args.open:
+            preview_series(args.series_uid, viewer_type=args.viewer)
+        else:
+            print(generate_viewer_url(args.series_uid, viewer_type=args.viewer))
+
+
+if __name__ == '__main__':
+    main()